@@ -1,36 +1,106 @@
-import getopt
+import locale
+import mmap
 import sys
 
+# Read command line args. The options always come as "-x value" pairs, so
+# there's no need for a full option parser. -s and -r may be given more
+# than once, in which case each pair is applied in turn, so that several
+# substitutions can be made in a single run.
+opts = list(zip(sys.argv[1::2], sys.argv[2::2]))
+flags = dict(opts)
+
 # Store input and output file names
-infile = ''
-outfile = ''
-searchExp = ''
-replaceExp = ''
-
-# Read command line args
-myopts, args = getopt.getopt(sys.argv[1:], "i:o:s:r:")
-
-###############################
-# o == option
-# a == argument passed to the o
-###############################
-for o, a in myopts:
-    if o == '-i':
-        infile = a
-    elif o == '-o':
-        outfile = a
-    elif o == '-s':
-        searchExp = a
-    elif o == '-r':
-        replaceExp = a
-    else:
-        print("Usage: %s -i input -o output" % sys.argv[0])
+try:
+    infile = flags['-i']
+    outfile = flags['-o']
+except KeyError:
+    print("Usage: %s -i input -o output [-s search -r replace ...]" %
+          sys.argv[0])
+    sys.exit(1)
+
+searchExps = [a for o, a in opts if o == '-s']
+replaceExps = [a for o, a in opts if o == '-r']
+if len(searchExps) != len(replaceExps):
+    print("Each -s option must have a matching -r option")
+    sys.exit(1)
+
+# Size of the blocks read when the input is streamed
+CHUNK_SIZE = 1 << 20
+
+# Mapped inputs larger than this are processed in CHUNK_SIZE shards, so we
+# never hold more than a shard's worth of the file in memory at once
+MAX_MAPPED_SIZE = 64 << 20
+
+
+def replace_bytes(data, search, replace):
+    """Return a copy of data with search replaced by replace.
+
+    Swapping one byte for another is done with a translation table, which
+    is cheaper than a substring search.
+    """
+    if len(search) == 1 and len(replace) == 1:
+        return data.translate(bytes.maketrans(search, replace))
+    return data.replace(search, replace)
 
-# Display input and output file name passed as the args
 
-f1 = open(infile, 'r')
-f2 = open(outfile, 'w')
-for line in f1:
-    f2.write(line.replace(searchExp, replaceExp))
-f1.close()
-f2.close()
+def replace_blocks(blocks, search, replace):
+    """Replace search with replace in a stream of blocks of bytes.
+
+    The tail of each block that could hold the start of a match spanning
+    into the next block is carried over, so matches are found exactly as
+    they would be if the whole file was replaced in one go.
+    """
+    if len(search) == 1 and len(replace) == 1:
+        # Single bytes can't span blocks, so no carry is needed
+        for buf in blocks:
+            yield replace_bytes(buf, search, replace)
+        return
+
+    keep = len(search) - 1
+    carry = b''
+    for buf in blocks:
+        parts = (carry + buf).split(search)
+        tail = parts.pop()
+        if parts:
+            yield replace.join(parts)
+            yield replace
+        split = max(len(tail) - keep, 0)
+        yield tail[:split]
+        carry = tail[split:]
+    yield carry
+
+
+def replace_stream(f1, f2, replacements):
+    """Copy f1 to f2 in large blocks, making each of the replacements."""
+    blocks = iter(lambda: f1.read(CHUNK_SIZE), b'')
+    for search, replace in replacements:
+        blocks = replace_blocks(blocks, search, replace)
+    for buf in blocks:
+        f2.write(buf)
+
+
+# The files are processed as raw bytes, so encode the expressions the same
+# way the text mode I/O would have decoded the file contents.
+encoding = locale.getpreferredencoding(False)
+replacements = [(s.encode(encoding), r.encode(encoding))
+                for s, r in zip(searchExps, replaceExps)]
+
+# Map the input file and perform the replacements in a single pass rather
+# than copying it line by line. Files that cannot be mapped (e.g. empty
+# files or pipes) are streamed through in large blocks instead, as are very
+# large files, reading the shards straight from the mapping.
+with open(infile, 'rb', buffering=CHUNK_SIZE) as f1, \
+        open(outfile, 'wb', buffering=CHUNK_SIZE) as f2:
+    try:
+        mm = mmap.mmap(f1.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        replace_stream(f1, f2, replacements)
+    else:
+        with mm:
+            if len(mm) > MAX_MAPPED_SIZE:
+                replace_stream(mm, f2, replacements)
+            else:
+                data = mm[:]
+                for search, replace in replacements:
+                    data = replace_bytes(data, search, replace)
+                f2.write(data)
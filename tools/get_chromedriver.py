@@ -13,14 +13,45 @@
 # machine and save it to the specified location.
 
 import argparse
+import json
 import os
+import pathlib
 import platform
+import re
+import shutil
 import subprocess
 import sys
-from urllib.request import urlopen, urlretrieve
-from urllib.error import URLError
+import tempfile
 import zipfile
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Both requests go to the same host, so share a single keep-alive connection
+# between them rather than paying for a new TLS handshake each time.
+session = requests.Session()
+session.mount('https://', HTTPAdapter(
+    pool_connections=1, pool_maxsize=2,
+    max_retries=Retry(total=3, backoff_factor=0.3)))
+
+# The operating system we're running on, and its name as known to
+# chromedriver
+OS_NAME = platform.system()
+CHROMEDRIVER_SYSTEMS = {
+    'Darwin': 'mac64',
+    'Linux': 'linux64',
+    'Windows': 'win32',
+}
+
+# Matches a full Chrome version number, capturing all but the build number
+VERSION_RE = re.compile(r'(\d+\.\d+\.\d+)\.\d+')
+
+# Where the version of each Chrome executable we've seen is remembered, so
+# we don't have to run it again until it changes.
+VERSION_CACHE = os.path.join(os.path.expanduser('~'), '.cache',
+                             'pgadmin-chromedriver.json')
+
 
 def read_command_line():
     """Read the command line arguments.
@@ -31,7 +62,7 @@ def read_command_line():
     parser = argparse.ArgumentParser(
         description='Get the correct version of chromedriver for the '
                     'specified Chrome installation and save it.')
-    if platform.system() != 'Windows':
+    if OS_NAME != 'Windows':
         parser.add_argument("chrome", metavar="CHROME",
                             help="the Chrome executable")
     parser.add_argument("directory", metavar="DIRECTORY",
@@ -42,6 +73,78 @@ def read_command_line():
     return args
 
 
+def get_version_cache_key(chrome):
+    """Get the key under which the version of a Chrome executable is cached.
+
+    Args:
+        chrome: The Chrome executable
+    Returns:
+        The resolved executable path and its modification time, or None if
+        the executable could not be found
+    """
+    path = shutil.which(chrome)
+    if path is None:
+        return None
+
+    path = os.path.realpath(path)
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def read_version_cache(key):
+    """Read a Chrome version number from the cache.
+
+    Args:
+        key: The cache key, as returned by get_version_cache_key()
+    Returns:
+        The cached Chrome version number, or None if there isn't one
+    """
+    if key is None:
+        return None
+
+    try:
+        with open(VERSION_CACHE) as fp:
+            entry = json.load(fp).get(key[0])
+    except (OSError, ValueError, AttributeError):
+        return None
+
+    if isinstance(entry, dict) and entry.get('mtime_ns') == key[1]:
+        return entry.get('chrome_version')
+
+    return None
+
+
+def write_version_cache(key, chrome_version):
+    """Save a Chrome version number in the cache.
+
+    Args:
+        key: The cache key, as returned by get_version_cache_key()
+        chrome_version: The Chrome version number
+    """
+    if key is None:
+        return
+
+    try:
+        with open(VERSION_CACHE) as fp:
+            cache = json.load(fp)
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+
+    cache[key[0]] = {'mtime_ns': key[1], 'chrome_version': chrome_version}
+
+    # Failing to save the cache just means we'll run Chrome again next time
+    try:
+        os.makedirs(os.path.dirname(VERSION_CACHE), exist_ok=True)
+        with open(VERSION_CACHE, 'w') as fp:
+            json.dump(cache, fp)
+    except OSError:
+        pass
+
+
 def get_chrome_version(args):
     """Get the Chrome version number.
 
@@ -50,7 +153,7 @@ def get_chrome_version(args):
     Returns:
         The Chrome version number
     """
-    if platform.system() == 'Windows':
+    if OS_NAME == 'Windows':
         # On Windows we need to examine the resource section of the binary
         import winreg
 
@@ -80,37 +183,50 @@ def get_chrome_version(args):
         if not version_str:
             print('The Chrome version could not be read from the registry.')
             sys.exit(1)
-
-        chrome_version = '.'.join(version_str.split()[-1].split('.')[:-1])
     else:
+        # Running Chrome is comparatively slow, so reuse the version we found
+        # last time if the executable hasn't changed since.
+        cache_key = get_version_cache_key(args.chrome)
+        chrome_version = read_version_cache(cache_key)
+        if chrome_version:
+            return chrome_version
+
         # On Linux/Mac we run the Chrome executable with the --version flag,
         # then parse the output.
         try:
-            result = subprocess.Popen([args.chrome, '--version'],
-                                      stdout=subprocess.PIPE)
+            result = subprocess.run([args.chrome, '--version'],
+                                    capture_output=True,
+                                    encoding='ascii', errors='replace',
+                                    timeout=5, check=False)
         except FileNotFoundError:
             print('The specified Chrome executable could not be found.')
             sys.exit(1)
+        except subprocess.TimeoutExpired:
+            print('The specified Chrome executable did not report its '
+                  'version in time.')
+            sys.exit(1)
 
-        version_str = result.stdout.read().decode("utf-8")
+        version_str = result.stdout
         # Check for 'Chrom' not 'Chrome' in case the user is using Chromium.
         if "Chrom" not in version_str:
             print('The specified Chrome executable output an unexpected '
                   'version string: {}.'.format(version_str))
             sys.exit(1)
-        # On some linux distro `chrome--version` gives output like
-        # 'Google Chrome 80.0.3987.132 unknown\n'
-        # so we need to check and remove the unknown string from the version
-        if version_str.endswith("unknown\n"):
-            version_str = version_str.strip("unknown\n").strip()
 
-        chrome_version = '.'.join(version_str.split()[-1].split('.')[:-1])
-
-    if chrome_version.count('.') != 2:
+    # The registry holds the bare version number, e.g. '80.0.3987.132',
+    # whilst Chrome prints something like 'Google Chrome 80.0.3987.132\n',
+    # possibly followed by other text such as 'unknown' on some distros.
+    match = VERSION_RE.search(version_str)
+    if match is None:
         print('The specified Chrome executable output an unexpected '
               'version string: {}.'.format(version_str))
         sys.exit(1)
 
+    chrome_version = match.group(1)
+
+    if OS_NAME != 'Windows':
+        write_version_cache(cache_key, chrome_version)
+
     return chrome_version
 
 
@@ -126,16 +242,14 @@ def get_chromedriver_version(chrome_version):
         .format(chrome_version)
 
     try:
-        fp = urlopen(url)
-    except URLError as e:
+        resp = session.get(url, timeout=10)
+        resp.raise_for_status()
+    except requests.exceptions.RequestException as e:
         print('The chromedriver catalog URL could not be accessed: {}'
               .format(e))
         sys.exit(1)
 
-    version = fp.read().decode("utf-8").strip()
-    fp.close()
-
-    return version
+    return resp.text.strip()
 
 
 def get_system():
@@ -144,17 +258,14 @@ def get_system():
     Returns:
         The system name
     """
-    if platform.system() == 'Darwin':
-        return 'mac64'
-    elif platform.system() == 'Linux':
-        return 'linux64'
-    elif platform.system() == 'Windows':
-        return 'win32'
-    else:
+    system = CHROMEDRIVER_SYSTEMS.get(OS_NAME)
+    if system is None:
         print("Unknown or unsupported operating system: {}"
-              .format(platform.system()))
+              .format(OS_NAME))
         sys.exit(1)
 
+    return system
+
 
 """The core structure of the app."""
 
@@ -163,8 +274,13 @@ args = read_command_line()
 
 chrome_version = get_chrome_version(args)
 
-# Check the directory exists
-if not os.path.isdir(args.directory):
+# Check the directory exists, resolving it once for use below
+try:
+    outdir = pathlib.Path(args.directory).resolve(strict=True)
+except (OSError, RuntimeError):
+    outdir = None
+
+if outdir is None or not outdir.is_dir():
     print('The specified output directory could not be accessed.')
     sys.exit(1)
 
@@ -178,33 +294,49 @@ url = 'https://chromedriver.storage.googleapis.com/{}/chromedriver_{}.zip' \
 print('Downloading chromedriver v{} for Chrome v{} on {}...'
       .format(chromedriver_version, chrome_version, system))
 
-try:
-    file, headers = urlretrieve(url)
-except URLError as e:
-    print('The chromedriver download URL could not be accessed: {}'
-          .format(e))
-    sys.exit(1)
+member = 'chromedriver.exe' if system == 'win32' else 'chromedriver'
+dest = outdir / member
 
-# Unzip chromedriver
-print('Extracting chromedriver...')
+# Stream the archive into a temporary file in large blocks rather than
+# holding the whole response in memory. We ask for it unencoded so there's
+# nothing to decompress on the way. Reading through iter_content() keeps
+# errors in the middle of the download wrapped as requests exceptions.
+with tempfile.TemporaryFile() as buf:
+    try:
+        with session.get(url, stream=True, timeout=30,
+                         headers={'Accept-Encoding': 'identity'}) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(1 << 20):
+                buf.write(chunk)
+    except requests.exceptions.RequestException as e:
+        print('The chromedriver download URL could not be accessed: {}'
+              .format(e))
+        sys.exit(1)
+    buf.seek(0)
+
+    # Unzip chromedriver
+    print('Extracting chromedriver...')
+
+    with zipfile.ZipFile(buf) as z:
+        try:
+            src = z.open(member)
+            found = True
+        except KeyError:
+            found = False
 
-found = False
-fp = open(file, 'rb')
-z = zipfile.ZipFile(fp)
-for name in z.namelist():
-    if (system == 'win32' and name == 'chromedriver.exe') or \
-            (system != 'win32' and name == 'chromedriver'):
-        z.extract(name, args.directory)
-        found = True
-fp.close()
+        # Copy the binary out in large blocks rather than ZipFile.extract()'s
+        # small default ones.
+        if found:
+            with src, open(dest, 'wb') as dst:
+                shutil.copyfileobj(src, dst, length=1 << 20)
 
 if not found:
     print("chromedriver could not be found in the downloaded archive: {}"
-          .format(file))
+          .format(url))
     sys.exit(1)
 
 # Set the permissions
 if system == 'mac64' or system == 'linux64':
-    os.chmod(os.path.join(args.directory, 'chromedriver'), 0o755)
+    os.chmod(dest, 0o755)
 
-print('Chromedriver downloaded to: {}'.format(args.directory))
+print('Chromedriver downloaded to: {}'.format(outdir))
@@ -12,12 +12,55 @@ import os
 import sys
 import traceback
 import json
+import mmap
+from functools import lru_cache
 
-from regression.python_test_utils.test_utils import get_db_connection
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 
 CURRENT_PATH = os.path.dirname(os.path.realpath(__file__))
-with open(CURRENT_PATH + "/user_mapping_test_data.json") as data_file:
-    test_cases = json.load(data_file)
+with open(CURRENT_PATH + "/user_mapping_test_data.json", 'rb') as data_file, \
+        mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+    test_cases = json.loads(mm[:])
+
+# Connection pools keyed by (db_name, host, port, username), so repeated
+# calls to the helpers below don't have to reconnect every time.
+_POOLS = {}
+
+
+def _get_pooled_connection(server, db_name):
+    """
+    This function will return a connection to the given database from the
+    pool for it, creating the pool if needed.
+    :param server: server details
+    :type server: dict
+    :param db_name: database name
+    :type db_name: str
+    :return: the pool and the connection taken from it
+    :rtype: tuple
+    """
+    key = (db_name, server['host'], server['port'], server['username'])
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool = ThreadedConnectionPool(1, 8,
+                                      database=db_name,
+                                      user=server['username'],
+                                      password=server['db_password'],
+                                      host=server['host'],
+                                      port=server['port'],
+                                      sslmode=server['sslmode'])
+        _POOLS[key] = pool
+
+    connection = pool.getconn()
+    # The backend may have been terminated since the connection was last
+    # used (e.g. when a database is dropped), so replace it if it's gone.
+    try:
+        connection.poll()
+    except psycopg2.Error:
+        pool.putconn(connection, close=True)
+        connection = pool.getconn()
+
+    return pool, connection
 
 
 def get_um_data(db_user, server):
@@ -37,6 +80,25 @@ def get_um_data(db_user, server):
     return data
 
 
+@lru_cache(maxsize=64)
+def _get_create_user_mapping_sql(username, password, fsrv_name):
+    """
+    This function will return the SQL to create a user mapping, caching it
+    as the same mapping is created repeatedly by the tests.
+    :param username: user name
+    :type username: str
+    :param password: password
+    :type password: str
+    :param fsrv_name: FS name
+    :type fsrv_name: str
+    :return: CREATE USER MAPPING statement
+    :rtype: str
+    """
+    return "CREATE USER MAPPING FOR %s SERVER %s OPTIONS" \
+           " (user '%s', password '%s')" % (username, fsrv_name, username,
+                                            password)
+
+
 def create_user_mapping(server, db_name, fsrv_name):
     """
     This function will create user mapping under the existing
@@ -51,34 +113,29 @@ def create_user_mapping(server, db_name, fsrv_name):
     :rtype: int
     """
     try:
-        connection = get_db_connection(db_name,
-                                       server['username'],
-                                       server['db_password'],
-                                       server['host'],
-                                       server['port'],
-                                       server['sslmode'])
-        old_isolation_level = connection.isolation_level
-        connection.set_isolation_level(0)
-        pg_cursor = connection.cursor()
-        query = "CREATE USER MAPPING FOR %s SERVER %s OPTIONS" \
-                " (user '%s', password '%s')" % (server['username'],
-                                                 fsrv_name,
-                                                 server['username'],
-                                                 server['db_password']
-                                                 )
-        pg_cursor.execute(query)
-        connection.set_isolation_level(old_isolation_level)
-        connection.commit()
-        # Get 'oid' from newly created user mapping
-        pg_cursor.execute(
-            "select umid from pg_catalog.pg_user_mappings where "
-            "srvname = '%s' order by umid asc limit 1" % fsrv_name)
-        oid = pg_cursor.fetchone()
-        um_id = ''
-        if oid:
-            um_id = oid[0]
-        connection.close()
-        return um_id
+        pool, connection = _get_pooled_connection(server, db_name)
+        try:
+            old_isolation_level = connection.isolation_level
+            connection.set_isolation_level(0)
+            pg_cursor = connection.cursor()
+            query = _get_create_user_mapping_sql(server['username'],
+                                                 server['db_password'],
+                                                 fsrv_name)
+            pg_cursor.execute(query)
+            connection.set_isolation_level(old_isolation_level)
+            connection.commit()
+            # Get 'oid' from newly created user mapping
+            pg_cursor.execute(
+                "select umid from pg_catalog.pg_user_mappings "
+                "where srvname = %s order by umid asc limit 1",
+                (fsrv_name,))
+            oid = pg_cursor.fetchone()
+            um_id = ''
+            if oid:
+                um_id = oid[0]
+            return um_id
+        finally:
+            pool.putconn(connection)
     except Exception:
         traceback.print_exc(file=sys.stderr)
 
@@ -96,18 +153,15 @@ def verify_user_mapping(server, db_name, fsrv_name):
     :rtype: tuple
     """
     try:
-        connection = get_db_connection(db_name,
-                                       server['username'],
-                                       server['db_password'],
-                                       server['host'],
-                                       server['port'],
-                                       server['sslmode'])
-        pg_cursor = connection.cursor()
-        pg_cursor.execute(
-            "select umid from pg_catalog.pg_user_mappings "
-            "where srvname = '%s' order by umid asc limit 1" % fsrv_name)
-        user_mapping = pg_cursor.fetchone()
-        connection.close()
-        return user_mapping
+        pool, connection = _get_pooled_connection(server, db_name)
+        try:
+            pg_cursor = connection.cursor()
+            pg_cursor.execute(
+                "select umid from pg_catalog.pg_user_mappings "
+                "where srvname = %s order by umid asc limit 1",
+                (fsrv_name,))
+            return pg_cursor.fetchone()
+        finally:
+            pool.putconn(connection)
     except Exception:
         traceback.print_exc(file=sys.stderr)
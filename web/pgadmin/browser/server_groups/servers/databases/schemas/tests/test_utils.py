@@ -8,7 +8,7 @@
 ##########################################################################
 
 from pgadmin.browser.server_groups.servers.databases.schemas.utils import \
-    DataTypeReader
+    DataTypeReader, _render_get_types, parse_rule_definition
 from pgadmin.utils.route import BaseTestGenerator
 from unittest.mock import patch, Mock
 
@@ -66,8 +66,10 @@ class DataTypeReaderTest(BaseTestGenerator):
     ]
 
     @patch('pgadmin.browser.server_groups.servers.databases.schemas.utils'
-           '.render_template')
+           '._render')
     def runTest(self, template_mock):
+        # Make sure the SQL is rendered rather than fetched from the cache
+        _render_get_types.cache_clear()
         template_mock.return_value = 'Some SQL'
         connection = Mock()
         connection.execute_2darray.return_value = [
@@ -98,3 +100,131 @@ class DataTypeReaderTest(BaseTestGenerator):
             add_serials=self.add_serials,
             schema_oid=self.schema_oid
         )
+
+
+class DataTypeReaderSchemaInNameTest(BaseTestGenerator):
+    scenarios = [
+        ('Plain type name is left unchanged',
+         dict(
+             typname='foo',
+             schema='public',
+             expected_name='foo',
+             expected_full_type='foo'
+         )),
+        ('Schema qualified type name has the schema removed',
+         dict(
+             typname='public.foo',
+             schema='public',
+             expected_name='foo',
+             expected_full_type='foo'
+         )),
+        ('Type name qualified with a quoted schema has the schema removed',
+         dict(
+             typname='"My Schema".foo',
+             schema='My Schema',
+             expected_name='foo',
+             expected_full_type='foo'
+         )),
+        ('Schema qualified array type name has the schema removed',
+         dict(
+             typname='public._foo',
+             schema='public',
+             expected_name='_foo',
+             expected_full_type='foo[]'
+         )),
+        ('Schema qualified type name with a type modifier keeps its length',
+         dict(
+             typname='public.varchar',
+             schema='public',
+             typmod=14,
+             expected_name='varchar',
+             expected_full_type='varchar(10)'
+         )),
+        ('Schema name in the middle of the type name is left unchanged',
+         dict(
+             typname='foo.public.bar',
+             schema='public',
+             expected_name='foo.public.bar',
+             expected_full_type='foo.public.bar'
+         )),
+        ('Schema name that is only a suffix of the prefix is left unchanged',
+         dict(
+             typname='mypublic.foo',
+             schema='public',
+             expected_name='mypublic.foo',
+             expected_full_type='mypublic.foo'
+         ))
+    ]
+
+    def runTest(self):
+        self.assertEqual(
+            DataTypeReader._check_schema_in_name(self.typname, self.schema),
+            self.expected_name
+        )
+        self.assertEqual(
+            DataTypeReader.get_full_type(self.schema, self.typname, False, 0,
+                                         getattr(self, 'typmod', -1)),
+            self.expected_full_type
+        )
+
+
+class ParseRuleDefinitionTest(BaseTestGenerator):
+    scenarios = [
+        ('Rule with a condition and an INSTEAD statement',
+         dict(
+             definition='CREATE RULE r1 AS\n    ON UPDATE TO public.t\n'
+                        '   WHERE (old.a = 1) DO INSTEAD  '
+                        'UPDATE public.t SET a = 2;',
+             expected_condition='old.a = 1',
+             expected_statements='UPDATE public.t SET a = 2'
+         )),
+        ('Rule without a condition',
+         dict(
+             definition='CREATE RULE r2 AS\n    ON UPDATE TO public.t DO  '
+                        'NOTHING;',
+             expected_condition='',
+             expected_statements='NOTHING'
+         )),
+        ('Rule with several statements',
+         dict(
+             definition='CREATE RULE r3 AS\n    ON UPDATE TO public.t\n'
+                        '   WHERE ((new.a > 1) AND (new.b < 2)) DO ( '
+                        'NOTIFY x;\n NOTIFY y;\n);',
+             expected_condition='(new.a > 1) AND (new.b < 2)',
+             expected_statements=' NOTIFY x;\n NOTIFY y;\n'
+         )),
+        ('Rule on a relation whose name contains DO',
+         dict(
+             definition='CREATE RULE r4 AS\n    ON UPDATE TO public."DOGS"\n'
+                        '   WHERE (old.a <> new.a) DO  NOTIFY x;',
+             expected_condition='old.a <> new.a',
+             expected_statements='NOTIFY x'
+         )),
+        ('Rule whose name starts with DO',
+         dict(
+             definition='CREATE RULE "DO x" AS\n    ON UPDATE TO public.t\n'
+                        '   WHERE (new.a > 1) DO  NOTIFY x;',
+             expected_condition='new.a > 1',
+             expected_statements='NOTIFY x'
+         )),
+        ('Rule on a quoted relation name containing WHERE and DO',
+         dict(
+             definition='CREATE RULE r5 AS\n    ON UPDATE TO '
+                        'public."DO ""x"" WHERE (1) DO "\n'
+                        '   WHERE (new.a > 1) DO  NOTIFY x;',
+             expected_condition='new.a > 1',
+             expected_statements='NOTIFY x'
+         ))
+    ]
+
+    def runTest(self):
+        result = parse_rule_definition({
+            'rows': [{
+                'definition': self.definition,
+                'ev_type': '2',
+                'is_instead': False
+            }]
+        })
+        self.assertEqual(result['event'], 'UPDATE')
+        self.assertEqual(result['condition'], self.expected_condition)
+        self.assertEqual(result['statements'], self.expected_statements)
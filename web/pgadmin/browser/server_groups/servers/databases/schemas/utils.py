@@ -10,10 +10,11 @@
 """Schema collection node helper class"""
 
 import json
-import copy
 import re
+from collections import defaultdict
+from functools import lru_cache
 
-from flask import render_template
+from flask import current_app
 
 from pgadmin.browser.collection import CollectionNodeModule
 from pgadmin.utils.ajax import internal_server_error
@@ -24,6 +25,124 @@ from pgadmin.utils.constants import DATATYPE_TIME_WITH_TIMEZONE,\
     DATATYPE_TIMESTAMP_WITH_TIMEZONE,\
     DATATYPE_TIMESTAMP_WITHOUT_TIMEZONE
 
+# Compiled templates, keyed by template path. As the paths include the
+# server type and version, there is at most one entry per template for each
+# of those, so the cache stays small.
+_TEMPLATE_CACHE = dict()
+
+
+def _render(path, **context):
+    """
+    Render the given template, compiling it on first use only. This avoids
+    the per call template lookup and context processing done by Flask's
+    render_template(), which none of the templates used here rely on.
+
+    :param path: template path
+    :param context: template variables
+    :return: rendered template
+    """
+    template = _TEMPLATE_CACHE.get(path)
+    if template is None:
+        template = current_app.jinja_env.get_template(path)
+        _TEMPLATE_CACHE[path] = template
+    return template.render(context)
+
+
+@lru_cache(maxsize=512)
+def _render_get_types(path, condition, add_serials, schema_oid):
+    """
+    Render the get_types.sql template. The result depends only on the
+    arguments, so it is cached for the repeated type lookups made while
+    loading and editing objects.
+
+    :param path: template path
+    :param condition: condition to restrict SQL statement
+    :param add_serials: add_serials flag
+    :param schema_oid: schema oid
+    :return: rendered SQL
+    """
+    return _render(path, condition=condition, add_serials=add_serials,
+                   schema_oid=schema_oid)
+
+
+# Type OIDs/names, as used by DataTypeReader.get_length_precision(), of the
+# types which take a length, a date/time precision or a numeric precision
+_TYPEVAL_L = frozenset((1560, 'bit',
+                        1561, 'bit[]',
+                        1562, 'varbit', 'bit varying',
+                        1563, 'varbit[]', 'bit varying[]',
+                        1042, 'bpchar', 'character',
+                        1043, 'varchar', 'character varying',
+                        1014, 'bpchar[]', 'character[]',
+                        1015, 'varchar[]', 'character varying[]'))
+_TYPEVAL_D = frozenset((1083, 'time',
+                        DATATYPE_TIME_WITHOUT_TIMEZONE,
+                        1114, 'timestamp',
+                        DATATYPE_TIMESTAMP_WITHOUT_TIMEZONE,
+                        1115, 'timestamp[]',
+                        'timestamp without time zone[]',
+                        1183, 'time[]',
+                        'time without time zone[]',
+                        1184, 'timestamptz',
+                        DATATYPE_TIMESTAMP_WITH_TIMEZONE,
+                        1185, 'timestamptz[]',
+                        'timestamp with time zone[]',
+                        1186, 'interval',
+                        1187, 'interval[]',
+                        1266, 'timetz',
+                        DATATYPE_TIME_WITH_TIMEZONE,
+                        1270, 'time with time zone[]'))
+_TYPEVAL_P = frozenset((1231, 'numeric[]',
+                        1700, 'numeric'))
+
+# (min_val, max_val) for a type, as returned by
+# DataTypeReader._types_length_checks(), keyed by whether it has a length,
+# whether it has a precision and whether it is a date/time type
+_LENGTH_CHECKS = {
+    (False, False, False): (0, 0),
+    (False, False, True): (0, 0),
+    (False, True, False): (0, 0),
+    (False, True, True): (0, 0),
+    (True, True, False): (1, 1000),
+    (True, True, True): (0, 1000),
+    # Max of integer value
+    (True, False, False): (1, 2147483647),
+    # Max value is 6 for data type like interval, timestamptz, etc..
+    (True, False, True): (0, 6),
+}
+
+# Types whose typmod is the length itself, see DataTypeReader._check_typmod()
+_TYPMOD_SIMPLE = frozenset(('time', 'timetz',
+                            DATATYPE_TIME_WITHOUT_TIMEZONE,
+                            DATATYPE_TIME_WITH_TIMEZONE,
+                            'timestamp', 'timestamptz',
+                            DATATYPE_TIMESTAMP_WITHOUT_TIMEZONE,
+                            DATATYPE_TIMESTAMP_WITH_TIMEZONE,
+                            'bit', 'bit varying', 'varbit'))
+
+# Patterns used to parse type names and rule definitions
+_RE_LEN_PREC = re.compile(r'(\d+),(\d+)')
+_RE_LEN = re.compile(r'(\d+)')
+_RE_TIME_PARENS = re.compile(r'(\(\d+\))')
+# The "CREATE RULE name AS ON event TO relation" head of a rule definition,
+# matched identifier by identifier so that a DO or WHERE inside a (quoted)
+# rule or relation name is skipped over
+_RULE_IDENT = r'(?:"(?:[^"]|"")*"|[^\s."]+)'
+_RE_RULE_HEAD = re.compile(r'CREATE\s+(?:OR\s+REPLACE\s+)?RULE\s+{0}\s+AS\s+'
+                           r'ON\s+\w+\s+TO\s+{0}(?:\.{0})*'
+                           .format(_RULE_IDENT))
+_RE_RULE_WHERE = re.compile(r"(?:WHERE)\s+(\([\s\S]*\))\s+(?:DO)")
+_RE_RULE_STMT = re.compile(r"(?:DO\s+)(?:INSTEAD\s+)?([\s\S]*)(?:;)")
+
+# Trigger type bits, as stored in pg_trigger.tgtype
+_TRIGGER_TYPE_ROW = 1 << 0
+_TRIGGER_TYPE_BEFORE = 1 << 1
+_TRIGGER_TYPE_INSERT = 1 << 2
+_TRIGGER_TYPE_DELETE = 1 << 3
+_TRIGGER_TYPE_UPDATE = 1 << 4
+_TRIGGER_TYPE_TRUNCATE = 1 << 5
+_TRIGGER_TYPE_INSTEAD = 1 << 6
+
 
 class SchemaChildModule(CollectionNodeModule):
     """
@@ -46,37 +165,36 @@ class SchemaChildModule(CollectionNodeModule):
     For jobs & schedules, we should set:
         CATALOG_DB_SUPPORTED = False
         SUPPORTED_SCHEMAS = ['pgagent']
+
+    SUPPORTED_SCHEMAS may be declared as a list or tuple; it is converted to a
+    frozenset when the subclass is created.
     """
     CATALOG_DB_SUPPORTED = True
     SUPPORTED_SCHEMAS = None
 
+    def __init_subclass__(cls, **kwargs):
+        super(SchemaChildModule, cls).__init_subclass__(**kwargs)
+
+        # SUPPORTED_SCHEMAS is only used for membership tests
+        if isinstance(cls.SUPPORTED_SCHEMAS, (list, tuple)):
+            cls.SUPPORTED_SCHEMAS = frozenset(cls.SUPPORTED_SCHEMAS)
+
     def backend_supported(self, manager, **kwargs):
-        return (
-            (
-                (
-                    kwargs['is_catalog'] and
-                    (
-                        (
-                            self.CATALOG_DB_SUPPORTED and
-                            kwargs['db_support']
-                        ) or (
-                            not self.CATALOG_DB_SUPPORTED and
-                            not kwargs[
-                                'db_support'] and
-                            (
-                                self.SUPPORTED_SCHEMAS is None or
-                                kwargs[
-                                    'schema_name'] in self.SUPPORTED_SCHEMAS
-                            )
-                        )
-                    )
-                ) or
-                (
-                    not kwargs['is_catalog'] and self.CATALOG_DB_SUPPORTED
+        if kwargs['is_catalog']:
+            db_support = kwargs['db_support']
+            if self.CATALOG_DB_SUPPORTED:
+                supported = bool(db_support)
+            else:
+                # Only look at the schema name when it matters
+                supported = not db_support and (
+                    self.SUPPORTED_SCHEMAS is None or
+                    kwargs['schema_name'] in self.SUPPORTED_SCHEMAS
                 )
-            ) and
+        else:
+            supported = self.CATALOG_DB_SUPPORTED
+
+        return supported and \
             CollectionNodeModule.backend_supported(self, manager, **kwargs)
-        )
 
     @property
     def module_use_template_javascript(self):
@@ -99,6 +217,11 @@ class DataTypeReader:
       - Returns data-types on the basis of the condition provided.
     """
 
+    # The get_types.sql template path, and the data_type_template_path it
+    # was built from
+    _get_types_template = None
+    _get_types_template_dir = None
+
     def _get_types_sql(self, conn, condition, add_serials, schema_oid):
         """
         Get sql for types.
@@ -110,42 +233,29 @@ class DataTypeReader:
         """
         # Check if template path is already set or not
         # if not then we will set the template path here
-        manager = conn.manager if not hasattr(self, 'manager') \
-            else self.manager
         if not hasattr(self, 'data_type_template_path'):
+            manager = conn.manager if not hasattr(self, 'manager') \
+                else self.manager
             self.data_type_template_path = 'datatype/sql/' + (
                 '#{0}#'.format(manager.version)
             )
-        sql = render_template(
-            "/".join([self.data_type_template_path, 'get_types.sql']),
-            condition=condition,
-            add_serials=add_serials,
-            schema_oid=schema_oid
-        )
+
+        # Only rebuild the full template path if the directory has changed,
+        # which normally happens just once per instance
+        if self._get_types_template_dir != self.data_type_template_path:
+            self._get_types_template = "/".join(
+                [self.data_type_template_path, 'get_types.sql'])
+            self._get_types_template_dir = self.data_type_template_path
+
+        sql = _render_get_types(self._get_types_template, condition,
+                                add_serials, schema_oid)
         status, rset = conn.execute_2darray(sql)
 
         return status, rset
 
     @staticmethod
     def _types_length_checks(length, typeval, precision):
-        min_val = 0
-        max_val = 0
-        if length:
-            min_val = 0 if typeval == 'D' else 1
-            if precision:
-                max_val = 1000
-            elif min_val:
-                # Max of integer value
-                max_val = 2147483647
-            else:
-                # Max value is 6 for data type like
-                # interval, timestamptz, etc..
-                if typeval == 'D':
-                    max_val = 6
-                else:
-                    max_val = 10
-
-        return min_val, max_val
+        return _LENGTH_CHECKS[(bool(length), bool(precision), typeval == 'D')]
 
     def get_types(self, conn, condition, add_serials=False, schema_oid=''):
         """
@@ -164,22 +274,28 @@ class DataTypeReader:
             if not status:
                 return status, rset
 
+            # Bind the names used for every row to locals up front
+            append = res.append
+            get_length_precision = self.get_length_precision
+            types_length_checks = DataTypeReader._types_length_checks
+
             for row in rset['rows']:
                 # Attach properties for precision
                 # & length validation for current type
-                precision = False
-                length = False
-
                 # Check if the type will have length and precision or not
-                if row['elemoid']:
-                    length, precision, typeval = self.get_length_precision(
-                        row['elemoid'])
+                elemoid = row['elemoid']
+                if elemoid:
+                    length, precision, typeval = get_length_precision(elemoid)
+                else:
+                    length = precision = False
+                    typeval = ''
 
-                min_val, max_val = DataTypeReader._types_length_checks(
+                min_val, max_val = types_length_checks(
                     length, typeval, precision)
 
-                res.append({
-                    'label': row['typname'], 'value': row['typname'],
+                typname = row['typname']
+                append({
+                    'label': typname, 'value': typname,
                     'typval': typeval, 'precision': precision,
                     'length': length, 'min_val': min_val, 'max_val': max_val,
                     'is_collatable': row['is_collatable'],
@@ -192,6 +308,7 @@ class DataTypeReader:
         return True, res
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def get_length_precision(elemoid_or_name):
         precision = False
         length = False
@@ -199,35 +316,11 @@ class DataTypeReader:
 
         # Check against PGOID/typename for specific type
         if elemoid_or_name:
-            if elemoid_or_name in (1560, 'bit',
-                                   1561, 'bit[]',
-                                   1562, 'varbit', 'bit varying',
-                                   1563, 'varbit[]', 'bit varying[]',
-                                   1042, 'bpchar', 'character',
-                                   1043, 'varchar', 'character varying',
-                                   1014, 'bpchar[]', 'character[]',
-                                   1015, 'varchar[]', 'character varying[]'):
+            if elemoid_or_name in _TYPEVAL_L:
                 typeval = 'L'
-            elif elemoid_or_name in (1083, 'time',
-                                     DATATYPE_TIME_WITHOUT_TIMEZONE,
-                                     1114, 'timestamp',
-                                     DATATYPE_TIMESTAMP_WITHOUT_TIMEZONE,
-                                     1115, 'timestamp[]',
-                                     'timestamp without time zone[]',
-                                     1183, 'time[]',
-                                     'time without time zone[]',
-                                     1184, 'timestamptz',
-                                     DATATYPE_TIMESTAMP_WITH_TIMEZONE,
-                                     1185, 'timestamptz[]',
-                                     'timestamp with time zone[]',
-                                     1186, 'interval',
-                                     1187, 'interval[]', 'interval[]',
-                                     1266, 'timetz',
-                                     DATATYPE_TIME_WITH_TIMEZONE,
-                                     1270, 'timetz', 'time with time zone[]'):
+            elif elemoid_or_name in _TYPEVAL_D:
                 typeval = 'D'
-            elif elemoid_or_name in (1231, 'numeric[]',
-                                     1700, 'numeric'):
+            elif elemoid_or_name in _TYPEVAL_P:
                 typeval = 'P'
             else:
                 typeval = ' '
@@ -249,49 +342,23 @@ class DataTypeReader:
         :param name: name of type.
         :return:
         """
-        length = '('
+        if name == 'date':
+            # Clear length
+            return ''
         if name == 'numeric':
-            _len = (typmod - 4) >> 16
-            _prec = (typmod - 4) & 0xffff
-            length += str(_len)
-            if _prec is not None:
-                length += ',' + str(_prec)
-        elif (
-            name == 'time' or
-            name == 'timetz' or
-            name == DATATYPE_TIME_WITHOUT_TIMEZONE or
-            name == DATATYPE_TIME_WITH_TIMEZONE or
-            name == 'timestamp' or
-            name == 'timestamptz' or
-            name == DATATYPE_TIMESTAMP_WITHOUT_TIMEZONE or
-            name == DATATYPE_TIMESTAMP_WITH_TIMEZONE or
-            name == 'bit' or
-            name == 'bit varying' or
-            name == 'varbit'
-        ):
-            _prec = 0
-            _len = typmod
-            length += str(_len)
-        elif name == 'interval':
-            _prec = 0
+            return '({0},{1})'.format((typmod - 4) >> 16,
+                                      (typmod - 4) & 0xffff)
+        if name in _TYPMOD_SIMPLE:
+            return '({0})'.format(typmod)
+        if name == 'interval':
             _len = typmod & 0xffff
             # Max length for interval data type is 6
-            # If length is greater then 6 then set length to None
+            # If length is greater then 6 then leave the length empty
             if _len > 6:
-                _len = ''
-            length += str(_len)
-        elif name == 'date':
-            # Clear length
-            length = ''
-        else:
-            _len = typmod - 4
-            _prec = 0
-            length += str(_len)
-
-        if len(length) > 0:
-            length += ')'
+                return '()'
+            return '({0})'.format(_len)
 
-        return length
+        return '({0})'.format(typmod - 4)
 
     @staticmethod
     def _get_full_type_value(name, schema, length, array):
@@ -325,14 +392,12 @@ class DataTypeReader:
         :param schema: schema name for check.
         :return: name
         """
-        if typname.find(schema + '".') >= 0:
-            name = typname[len(schema) + 3]
-        elif typname.find(schema + '.') >= 0:
-            name = typname[len(schema) + 1]
-        else:
-            name = typname
+        if typname.startswith('"' + schema + '".'):
+            return typname[len(schema) + 3:]
+        elif typname.startswith(schema + '.'):
+            return typname[len(schema) + 1:]
 
-        return name
+        return typname
 
     @staticmethod
     def get_full_type(nsp, typname, is_dup, numdims, typmod):
@@ -344,8 +409,17 @@ class DataTypeReader:
             condition: condition to restrict SQL statement
         """
         schema = nsp if nsp is not None else ''
+
+        # Fast path for the common case of an unqualified, non-array type
+        # with no type modifier, which is returned unchanged
+        if typmod == -1 and not numdims and typname and \
+                not typname.startswith(('_', '"')) and \
+                not typname.endswith('[]') and \
+                not typname.startswith(schema + '.') and \
+                not (typname == 'char' and schema == 'pg_catalog'):
+            return typname
+
         name = ''
-        array = ''
         length = ''
 
         name = DataTypeReader._check_schema_in_name(typname, schema)
@@ -363,10 +437,7 @@ class DataTypeReader:
         if name.startswith('"') and name.endswith('"'):
             name = name[1:-1]
 
-        if numdims > 0:
-            while numdims:
-                array += '[]'
-                numdims -= 1
+        array = '[]' * numdims if numdims > 0 else ''
 
         if typmod != -1:
             length = DataTypeReader._check_typmod(typmod, name)
@@ -393,7 +464,7 @@ class DataTypeReader:
         is_array = False
         if type_name.endswith('[]'):
             is_array = True
-            type_name = type_name.rstrip('[]')
+            type_name = type_name[:-2]
 
         idx = type_name.find('(')
         if idx and type_name.endswith(')'):
@@ -404,9 +475,7 @@ class DataTypeReader:
             end_idx = type_name.find(')')
             # If we found the end then form the type string
             if end_idx != 1:
-                from re import sub as sub_str
-                pattern = r'(\(\d+\))'
-                type_name = sub_str(pattern, '', type_name)
+                type_name = _RE_TIME_PARENS.sub('', type_name)
         # We need special handling for interval types like
         # interval hours to minute.
         elif type_name.startswith("interval"):
@@ -428,13 +497,13 @@ class DataTypeReader:
         """
         t_len, t_prec = None, None
         if is_tlength and is_precision:
-            match_obj = re.search(r'(\d+),(\d+)', fulltype)
+            match_obj = _RE_LEN_PREC.search(fulltype)
             if match_obj:
                 t_len = match_obj.group(1)
                 t_prec = match_obj.group(2)
         elif is_tlength:
             # If we have length only
-            match_obj = re.search(r'(\d+)', fulltype)
+            match_obj = _RE_LEN.search(fulltype)
             if match_obj:
                 t_len = match_obj.group(1)
                 t_prec = None
@@ -442,63 +511,52 @@ class DataTypeReader:
         return t_len, t_prec
 
 
-def trigger_definition(data):
+@lru_cache(maxsize=128)
+def _decode_tgtype(tgtype):
     """
-    This function will set the trigger definition details from the raw data
+    This function will decode the trigger type bitmask. Only a handful of
+    distinct values occur in practice, so the result is cached.
 
     Args:
-        data: Properties data
+        tgtype: pg_trigger.tgtype value
 
     Returns:
-        Updated properties data with trigger definition
+        Tuple of (fires, is_row_trigger, evnt_insert, evnt_delete,
+        evnt_update, evnt_truncate)
     """
-
-    # Here we are storing trigger definition
-    # We will use it to check trigger type definition
-    trigger_definition = {
-        'TRIGGER_TYPE_ROW': (1 << 0),
-        'TRIGGER_TYPE_BEFORE': (1 << 1),
-        'TRIGGER_TYPE_INSERT': (1 << 2),
-        'TRIGGER_TYPE_DELETE': (1 << 3),
-        'TRIGGER_TYPE_UPDATE': (1 << 4),
-        'TRIGGER_TYPE_TRUNCATE': (1 << 5),
-        'TRIGGER_TYPE_INSTEAD': (1 << 6)
-    }
-
     # Fires event definition
-    if data['tgtype'] & trigger_definition['TRIGGER_TYPE_BEFORE']:
-        data['fires'] = 'BEFORE'
-    elif data['tgtype'] & trigger_definition['TRIGGER_TYPE_INSTEAD']:
-        data['fires'] = 'INSTEAD OF'
+    if tgtype & _TRIGGER_TYPE_BEFORE:
+        fires = 'BEFORE'
+    elif tgtype & _TRIGGER_TYPE_INSTEAD:
+        fires = 'INSTEAD OF'
     else:
-        data['fires'] = 'AFTER'
-
-    # Trigger of type definition
-    if data['tgtype'] & trigger_definition['TRIGGER_TYPE_ROW']:
-        data['is_row_trigger'] = True
-    else:
-        data['is_row_trigger'] = False
+        fires = 'AFTER'
+
+    return (
+        fires,
+        # Trigger of type definition
+        bool(tgtype & _TRIGGER_TYPE_ROW),
+        # Event definition
+        bool(tgtype & _TRIGGER_TYPE_INSERT),
+        bool(tgtype & _TRIGGER_TYPE_DELETE),
+        bool(tgtype & _TRIGGER_TYPE_UPDATE),
+        bool(tgtype & _TRIGGER_TYPE_TRUNCATE)
+    )
 
-    # Event definition
-    if data['tgtype'] & trigger_definition['TRIGGER_TYPE_INSERT']:
-        data['evnt_insert'] = True
-    else:
-        data['evnt_insert'] = False
 
-    if data['tgtype'] & trigger_definition['TRIGGER_TYPE_DELETE']:
-        data['evnt_delete'] = True
-    else:
-        data['evnt_delete'] = False
+def trigger_definition(data):
+    """
+    This function will set the trigger definition details from the raw data
 
-    if data['tgtype'] & trigger_definition['TRIGGER_TYPE_UPDATE']:
-        data['evnt_update'] = True
-    else:
-        data['evnt_update'] = False
+    Args:
+        data: Properties data
 
-    if data['tgtype'] & trigger_definition['TRIGGER_TYPE_TRUNCATE']:
-        data['evnt_truncate'] = True
-    else:
-        data['evnt_truncate'] = False
+    Returns:
+        Updated properties data with trigger definition
+    """
+    data['fires'], data['is_row_trigger'], data['evnt_insert'], \
+        data['evnt_delete'], data['evnt_update'], data['evnt_truncate'] = \
+        _decode_tgtype(data['tgtype'])
 
     return data
 
@@ -516,18 +574,25 @@ def parse_rule_definition(res):
     try:
         res_data = res['rows'][0]
         data_def = res_data['definition']
-        import re
 
-        # Parse data for condition
+        # Skip the rule and relation names, if the head can be recognised
+        head_match = _RE_RULE_HEAD.match(data_def)
+        start = head_match.end() if head_match is not None else 0
+
+        # Parse data for statements, the DO keyword found here also splits
+        # off the part of the definition that may hold the condition
         condition = ''
-        condition_part_match = re.search(
-            r"((?:ON)\s+(?:[\s\S]+?)"
-            r"(?:TO)\s+(?:[\s\S]+?)(?:DO))", data_def)
-        if condition_part_match is not None:
-            condition_part = condition_part_match.group(1)
+        statement = ''
+        statement_match = _RE_RULE_STMT.search(data_def, start)
+        if statement_match is not None:
+            statement = statement_match.group(1)
+            # also remove enclosing brackets
+            if statement.startswith('(') and statement.endswith(')'):
+                statement = statement[1:-1]
 
-            condition_match = re.search(
-                r"(?:WHERE)\s+(\([\s\S]*\))\s+(?:DO)", condition_part)
+            # Parse data for condition, only up to (and including) the DO
+            condition_match = _RE_RULE_WHERE.search(
+                data_def, start, statement_match.start() + 2)
 
             if condition_match is not None:
                 condition = condition_match.group(1)
@@ -535,17 +600,6 @@ def parse_rule_definition(res):
                 if condition.startswith('(') and condition.endswith(')'):
                     condition = condition[1:-1]
 
-            # Parse data for statements
-        statement_match = re.search(
-            r"(?:DO\s+)(?:INSTEAD\s+)?([\s\S]*)(?:;)", data_def)
-
-        statement = ''
-        if statement_match is not None:
-            statement = statement_match.group(1)
-            # also remove enclosing brackets
-            if statement.startswith('(') and statement.endswith(')'):
-                statement = statement[1:-1]
-
         # set columns parse data
         res_data['event'] = {
             '1': 'SELECT',
@@ -561,6 +615,47 @@ def parse_rule_definition(res):
     return res_data
 
 
+# The vacuum settings fields for each setting type (table or toast), and the
+# quoted, comma separated list of the field names for use in SQL. These come
+# from a static template, so are only loaded once, on first use.
+_VACUUM_FIELDS = None
+_VACUUM_KEYS_SQL = None
+
+
+def _get_vacuum_fields():
+    """
+    This function will return the vacuum settings fields and the SQL lists
+    of their names, both keyed by setting type.
+    """
+    global _VACUUM_FIELDS, _VACUUM_KEYS_SQL
+
+    if _VACUUM_FIELDS is None:
+        # returns an array of name & label values
+        vacuum_fields = json.loads(
+            _render("vacuum_settings/vacuum_fields.json"))
+
+        # returns an array of setting & name values
+        _VACUUM_KEYS_SQL = dict(
+            (setting_type, "'" + "','".join(fields.keys()) + "'")
+            for setting_type, fields in vacuum_fields.items()
+        )
+        _VACUUM_FIELDS = vacuum_fields
+
+    return _VACUUM_FIELDS, _VACUUM_KEYS_SQL
+
+
+@lru_cache(maxsize=None)
+def _get_vacuum_defaults_sql(setting_type):
+    """
+    This function will return the SQL to fetch the default vacuum settings of
+    the given type. The template is not versioned and its only input is the
+    fixed list of field names for the type, so it is only rendered once.
+    """
+    _, vacuum_fields_keys = _get_vacuum_fields()
+    return _render('vacuum_settings/sql/vacuum_defaults.sql',
+                   columns=vacuum_fields_keys[setting_type])
+
+
 class VacuumSettings:
     """
     VacuumSettings Class.
@@ -587,7 +682,7 @@ class VacuumSettings:
         * type - table/toast vacuum type
 
     """
-    vacuum_settings = dict()
+    vacuum_settings = defaultdict(dict)
 
     def fetch_default_vacuum_settings(self, conn, sid, setting_type):
         """
@@ -598,21 +693,13 @@ class VacuumSettings:
         :param setting_type: Type (table or toast)
         :return:
         """
-        if sid in VacuumSettings.vacuum_settings:
-            if setting_type in VacuumSettings.vacuum_settings[sid]:
-                return VacuumSettings.vacuum_settings[sid][setting_type]
-        else:
-            VacuumSettings.vacuum_settings[sid] = dict()
-
-        # returns an array of name & label values
-        vacuum_fields = render_template("vacuum_settings/vacuum_fields.json")
-        vacuum_fields = json.loads(vacuum_fields)
+        try:
+            return VacuumSettings.vacuum_settings[sid][setting_type]
+        except KeyError:
+            pass
 
-        # returns an array of setting & name values
-        vacuum_fields_keys = "'" + "','".join(
-            vacuum_fields[setting_type].keys()) + "'"
-        SQL = render_template('vacuum_settings/sql/vacuum_defaults.sql',
-                              columns=vacuum_fields_keys)
+        vacuum_fields, _ = _get_vacuum_fields()
+        SQL = _get_vacuum_defaults_sql(setting_type)
 
         status, res = conn.execute_dict(SQL)
         if not status:
@@ -625,7 +712,7 @@ class VacuumSettings:
             row['column_type'] = vacuum_fields[setting_type][row_name][2]
 
         VacuumSettings.vacuum_settings[sid][setting_type] = res['rows']
-        return VacuumSettings.vacuum_settings[sid][setting_type]
+        return res['rows']
 
     def get_vacuum_table_settings(self, conn, sid):
         """
@@ -661,8 +748,12 @@ class VacuumSettings:
         * type - table/toast vacuum type
         """
 
-        vacuum_settings_tmp = copy.deepcopy(self.fetch_default_vacuum_settings(
-            conn, self.manager.sid, type))
+        # Only the top level 'value' key of each row is changed below, so a
+        # shallow copy of each row is enough to protect the cached settings
+        vacuum_settings_tmp = [
+            dict(row) for row in self.fetch_default_vacuum_settings(
+                conn, self.manager.sid, type)
+        ]
 
         for row in vacuum_settings_tmp:
             row_name = row['name']
@@ -677,6 +768,26 @@ class VacuumSettings:
         return vacuum_settings_tmp
 
 
+# Paths of the get_name.sql and nodes.sql schema templates, keyed by
+# (server_type, version)
+_SCHEMA_TEMPLATE_PATHS = dict()
+
+
+def _get_schema_template_paths(server_type, ver):
+    """
+    This function will return the paths of the get_name.sql and nodes.sql
+    templates for the given server type and version.
+    """
+    paths = _SCHEMA_TEMPLATE_PATHS.get((server_type, ver))
+    if paths is None:
+        template_path = 'schemas/{0}/#{1}#/sql/'.format(server_type, ver)
+        paths = (template_path + 'get_name.sql',
+                 template_path + 'nodes.sql')
+        _SCHEMA_TEMPLATE_PATHS[(server_type, ver)] = paths
+
+    return paths
+
+
 def get_schema(sid, did, scid):
     """
     This function will return the schema name.
@@ -686,17 +797,12 @@ def get_schema(sid, did, scid):
     manager = driver.connection_manager(sid)
     conn = manager.connection(did=did)
 
-    ver = manager.version
-    server_type = manager.server_type
+    get_name_path, _ = _get_schema_template_paths(manager.server_type,
+                                                  manager.version)
 
     # Fetch schema name
     status, schema_name = conn.execute_scalar(
-        render_template("/".join(['schemas',
-                                  '{0}/#{1}#'.format(server_type,
-                                                     ver),
-                                  'sql/get_name.sql']),
-                        conn=conn, scid=scid
-                        )
+        _render(get_name_path, conn=conn, scid=scid)
     )
 
     return status, schema_name
@@ -707,13 +813,11 @@ def get_schemas(conn, show_system_objects=False):
     This function will return the schemas.
     """
 
-    ver = conn.manager.version
-    server_type = conn.manager.server_type
+    _, nodes_path = _get_schema_template_paths(conn.manager.server_type,
+                                               conn.manager.version)
 
-    SQL = render_template(
-        "/".join(['schemas',
-                  '{0}/#{1}#'.format(server_type, ver),
-                  'sql/nodes.sql']),
+    SQL = _render(
+        nodes_path,
         show_sysobj=show_system_objects,
         schema_restrictions=None
     )